@@ -0,0 +1,93 @@
+# Startup benchmark for the kodi-repo-bootstrap CLI based on `python -X importtime`.
+#
+# It checks that
+#   - the modules of the single run modes (XML parsing, ZIP handling, multiprocessing, asyncio, ...) are not
+#     imported at startup, but only by the run mode that needs them
+#   - the time for importing the CLI entry point stays below a budget
+#
+# The script exits with a non-zero status if a check fails, so it can be used in CI.
+#
+# usage: python benchmarks/import_time.py [--budget-ms 80] [--runs 7]
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ENTRY_POINT: str = "kodi_repo_bootstrap.main"
+
+# these modules must not be imported by the entry point
+LAZY_MODULES: Tuple[str, ...] = (
+    "xml.dom.minidom",
+    "zipfile",
+    "importlib_resources",
+    "concurrent.futures.process",
+    "multiprocessing",
+    "asyncio",
+    "kodi_repo_bootstrap.addon.addon",
+    "kodi_repo_bootstrap.addon.manager",
+    "kodi_repo_bootstrap.repo.manager",
+    "kodi_repo_bootstrap.repo.plan",
+    "kodi_repo_bootstrap.repo.server",
+    "kodi_repo_bootstrap.repo.verify",
+)
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    # returns the self import time in microseconds of every imported module
+    result: subprocess.CompletedProcess = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                                                         capture_output=True, text=True, check=True)
+
+    times: Dict[str, int] = {}
+    line: str
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, _, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(self_us)
+
+    return times
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Import time budget of the CLI")
+    parser.add_argument("--budget-ms", type=float, default=80.0,
+                        help="The maximum import time of the entry point (without the interpreter startup)")
+    parser.add_argument("--runs", type=int, default=7, help="The number of runs (the median is used)")
+    args: argparse.Namespace = parser.parse_args()
+
+    # warm up (writes the bytecode caches)
+    entry_point_modules: Dict[str, int] = import_times(f"import {ENTRY_POINT}")
+
+    failed: bool = False
+
+    eager_modules: List[str] = [m for m in LAZY_MODULES if m in entry_point_modules]
+    if eager_modules:
+        failed = True
+        print(f"FAIL: imported at startup, but should be imported lazily: {', '.join(eager_modules)}")
+
+    # the time of the interpreter startup is subtracted
+    interpreter_totals: List[int] = [sum(import_times("pass").values()) for _ in range(args.runs)]
+    entry_point_totals: List[int] = [sum(import_times(f"import {ENTRY_POINT}").values()) for _ in range(args.runs)]
+
+    startup_ms: float = (statistics.median(entry_point_totals) - statistics.median(interpreter_totals)) / 1000
+    print(f"import {ENTRY_POINT}: {startup_ms:.1f}ms (budget: {args.budget_ms:.1f}ms)")
+    if startup_ms > args.budget_ms:
+        failed = True
+        print("FAIL: the import time budget is exceeded")
+
+    # the slowest modules help to find the cause of a regression
+    slowest: List[Tuple[str, int]] = sorted(import_times(f"import {ENTRY_POINT}").items(),
+                                            key=lambda item: item[1], reverse=True)[:10]
+    print("slowest modules (self time):")
+    module: str
+    self_us: int
+    for module, self_us in slowest:
+        print(f"\t{self_us / 1000:6.2f}ms  {module}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
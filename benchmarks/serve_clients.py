@@ -0,0 +1,104 @@
+# Load test for `kodi-repo-bootstrap --serve` with many concurrent Kodi-style clients.
+#
+# Every client keeps one connection open and repeats what Kodi does when it checks a repository:
+#   1. GET addons.xml.md5
+#   2. GET addons.xml (gzip, conditional on the ETag of the previous response)
+#   3. GET every addon ZIP file (conditional, the first time as a range request that is resumed)
+#
+# usage: python benchmarks/serve_clients.py REPO_DIR [--url http://127.0.0.1:8080] [--clients 200] [--duration 10]
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+USER_AGENT: str = "Kodi/21.0 (X11; Linux x86_64) App_Bitness/64 Version/21.0-Git:benchmark"
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str,
+                  headers: Dict[str, str]) -> Tuple[int, Dict[str, str], int]:
+    head: str = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: {USER_AGENT}\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write(head.encode("latin-1") + b"\r\n")
+    await writer.drain()
+
+    status: int = int((await reader.readline()).split()[1])
+    response_headers: Dict[str, str] = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+
+    length: int = int(response_headers.get("content-length", "0"))
+    await reader.readexactly(length)
+
+    return status, response_headers, length
+
+
+async def client(url: str, zip_paths: List[str], deadline: float,
+                 latencies: List[float], statuses: Dict[int, int], received: List[int]) -> None:
+    split_url = urlsplit(url)
+    reader, writer = await asyncio.open_connection(split_url.hostname, split_url.port or 80)
+    etags: Dict[str, str] = {}
+
+    async def get(path: str, extra_headers: Optional[Dict[str, str]]=None) -> Tuple[int, Dict[str, str]]:
+        headers: Dict[str, str] = dict(extra_headers or {})
+        if path in etags:
+            headers["If-None-Match"] = etags[path]
+
+        start: float = time.perf_counter()
+        status, response_headers, length = await request(reader, writer, split_url.netloc, path, headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        received[0] += length
+
+        if status == 200 and "etag" in response_headers:
+            etags[path] = response_headers["etag"]
+        return status, response_headers
+
+    try:
+        while time.perf_counter() < deadline:
+            await get("/addons.xml.md5")
+            await get("/addons.xml", {"Accept-Encoding": "gzip"})
+
+            zip_path: str
+            for zip_path in zip_paths:
+                if zip_path not in etags:
+                    # the download gets interrupted after the first KiB and is resumed
+                    status, response_headers = await get(zip_path, {"Range": "bytes=0-1023"})
+                    if status == 206 and int(response_headers["content-range"].rpartition("/")[2]) > 1024:
+                        await get(zip_path, {"Range": "bytes=1024-", "If-Range": response_headers.get("etag", "")})
+                await get(zip_path)
+    finally:
+        writer.close()
+
+
+async def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Load test for the repository HTTP server")
+    parser.add_argument("repo_dir", type=Path, help="The repository directory that is served")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="The URL of the server")
+    parser.add_argument("--clients", type=int, default=200, help="The number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="The duration of the test in seconds")
+    args: argparse.Namespace = parser.parse_args()
+
+    zip_paths: List[str] = ["/" + p.relative_to(args.repo_dir).as_posix() for p in args.repo_dir.glob("*/*.zip")]
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    received: List[int] = [0]
+
+    start: float = time.perf_counter()
+    await asyncio.gather(*(client(args.url, zip_paths, start + args.duration, latencies, statuses, received)
+                           for _ in range(args.clients)))
+    elapsed: float = time.perf_counter() - start
+
+    quantiles: List[float] = statistics.quantiles(latencies, n=100)
+    print(f"{len(latencies)} requests in {elapsed:.1f}s: {len(latencies) / elapsed:.0f} req/s, "
+          f"{received[0] / elapsed / 1024 / 1024:.1f} MiB/s")
+    print(f"latency p50 {quantiles[49] * 1000:.2f}ms, p99 {quantiles[98] * 1000:.2f}ms")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
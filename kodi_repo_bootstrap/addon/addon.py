@@ -1,10 +1,11 @@
 import re
 import shutil
 import zipfile
-import importlib_resources
+from dataclasses import dataclass
+from functools import cache
 from io import BufferedReader, BufferedWriter, BytesIO, TextIOWrapper
 from pathlib import Path
-from typing import IO, Final, List, Optional, cast
+from typing import IO, Dict, Final, Iterator, List, Optional, Tuple, cast
 from xml.dom import minidom
 from xml.dom.minidom import Document, Element, Node
 from zipfile import ZipFile
@@ -14,40 +15,54 @@ from kodi_repo_bootstrap.repo.config import Config
 from kodi_repo_bootstrap.repo.version import SemanticVersion
 
 
+@dataclass(frozen=True)
+class AddonMetadata:
+    # compact and picklable representation of a parsed addon.xml file
+    id: str
+    version: SemanticVersion
+    addon_path: Path
+    asset_path_strs: Tuple[str, ...]
+    addon_xml_lines: Tuple[str, ...]
+
+
 class Addon:
     _ADDON_XML_FILE: Final[str] = "addon.xml"
 
-    def __init__(self, addon_path: Path) -> None:
+    # fixed sizes of the ZIP records (without the file names)
+    __ZIP_LOCAL_HEADER_SIZE: Final[int] = 30
+    __ZIP_CENTRAL_DIR_HEADER_SIZE: Final[int] = 46
+    __ZIP_END_OF_CENTRAL_DIR_SIZE: Final[int] = 22
+
+    def __init__(self, addon_path: Path, metadata: Optional[AddonMetadata]=None) -> None:
         self.__addon_root: Path = addon_path
 
-        self.__addon_xml_bytes: Optional[bytes] = self.__get_file_bytes(Addon._ADDON_XML_FILE)
-        if self.__addon_xml_bytes is None:
+        # the metadata may already be parsed, e.g. by a worker process of the AddonManager
+        self.__metadata: AddonMetadata = metadata if metadata is not None else Addon.read_metadata(addon_path)
+
+    @classmethod
+    def read_metadata(cls, addon_path: Path) -> AddonMetadata:
+        addon_xml_bytes: Optional[bytes] = cls.__get_file_bytes(addon_path, Addon._ADDON_XML_FILE)
+        if addon_xml_bytes is None:
             raise ValueError(f"'{addon_path}' is not a regular addon directory or addon ZIP archive.")
 
-        self.__parsed_xml: Document
-        self.__xml_lines: List[str]
-        with BytesIO(self.__addon_xml_bytes) as addon_xml_fp:
-            self.__parsed_xml = minidom.parse(addon_xml_fp)
+        parsed_xml: Document
+        xml_lines: List[str]
+        with BytesIO(addon_xml_bytes) as addon_xml_fp:
+            parsed_xml = minidom.parse(addon_xml_fp)
 
             # reset file descriptor
             addon_xml_fp.seek(0)
 
-            self.__xml_lines = TextIOWrapper(addon_xml_fp).readlines()
+            xml_lines = TextIOWrapper(addon_xml_fp).readlines()
 
         # the "addon" tag is the root tag
-        root: List[Element] = self.__parsed_xml.getElementsByTagName("addon")
+        root: List[Element] = parsed_xml.getElementsByTagName("addon")
         if len(root) != 1:
             raise ValueError(f"The addon.xml file of '{addon_path}' has the wrong format.")
         root_tag: Element = root[0]
 
-        # id
-        self.__id: str = root_tag.getAttribute("id")
-
-        # version
-        self.__version: SemanticVersion = SemanticVersion(root_tag.getAttribute("version"))
-
         # assets
-        self.__asset_path_strs: List[str] = []
+        asset_path_strs: List[str] = []
 
         extension: Element
         for extension in root_tag.getElementsByTagName("extension"):
@@ -67,7 +82,7 @@ class Addon:
                         # the first child (Node.TEXT_NODE) of an asset element contains the path
                         child: Optional[Element] = cast(Optional[Element], asset.firstChild)
                         if child is not None and child.nodeType == Node.TEXT_NODE:
-                            self.__asset_path_strs.append(child.nodeValue)
+                            asset_path_strs.append(child.nodeValue)
 
                 # can exit here, because there is only one 'assets' tag
                 break
@@ -75,25 +90,39 @@ class Addon:
             # the assets tag must be in the "xbmc.addon.metadata" extension
             break
 
+        return AddonMetadata(id=root_tag.getAttribute("id"),
+                             version=SemanticVersion(root_tag.getAttribute("version")),
+                             addon_path=addon_path,
+                             asset_path_strs=tuple(asset_path_strs),
+                             addon_xml_lines=tuple(xml_lines))
+
+    @property
+    def metadata(self) -> AddonMetadata:
+        return self.__metadata
+
     @property
-    def addon_xml_lines(self) -> List[str]:
-        return self.__xml_lines
+    def addon_xml_lines(self) -> Tuple[str, ...]:
+        return self.__metadata.addon_xml_lines
 
     @property
     def id(self) -> str:
-        return self.__id
+        return self.__metadata.id
 
     @property
     def version(self) -> SemanticVersion:
-        return self.__version
+        return self.__metadata.version
 
     @property
     def addon_path(self) -> Path:
         return self.__addon_root
 
-    def create_zip_file(self, dest_dir: Path, glob_pattern: str="**/*") -> None:
+    @property
+    def zip_file_name(self) -> str:
+        return f"{self.id}-{self.version}.zip"
+
+    def create_zip_file(self, dest_dir: Path, glob_pattern: str="**/*") -> Path:
         # the path of the zip file
-        zip_file_path: Path = dest_dir / f"{self.__id}-{self.__version}.zip"
+        zip_file_path: Path = dest_dir / self.zip_file_name
 
         if self.__addon_root.is_file():
             print(f"'{self.__addon_root}' is already a ZIP archive. Just copy it.")
@@ -102,29 +131,14 @@ class Addon:
                          dst=zip_file_path)
 
         else:
-            print(f"Generate zip file for addon: {self.__id}-{self.__version}")
+            print(f"Generate zip file for addon: {self.id}-{self.version}")
 
             try:
                 # create the zip file
                 with ZipFile(zip_file_path, 'w', compression=zipfile.ZIP_DEFLATED) as zip_content:
-                    # iterate over the addon directory (default glob_pattern: "**/*")
                     current_path: Path
-                    for current_path in self.__addon_root.glob(glob_pattern):
-                        # ignore any dotfiles / dotdirectories
-                        if any(part.startswith(".") for part in current_path.parts):
-                            continue
-
-                        # the directory structure in the ZIP file:
-                        # <addon_id>-<addon_version>.zip
-                        #              |- <addon_id>/
-                        #              |      |- addon.xml
-                        #              |      |- ...
-
-                        # the root directory in the ZIP file is named with the addon ID
-                        archive_path: Path = Path(self.__id)
-                        # add all addon files relative to this ZIP root
-                        archive_path = archive_path / current_path.relative_to(self.__addon_root)
-
+                    archive_path: Path
+                    for current_path, archive_path in self.__iter_zip_content(glob_pattern):
                         zip_content.write(current_path, archive_path)
             except OSError:
                 print(f"Error writing ZIP file: '{zip_file_path}'")
@@ -132,44 +146,122 @@ class Addon:
         # create md5 file for the zip file
         File.create_md5_file(zip_file_path)
 
+        return zip_file_path
+
+    def estimate_zip_file_size(self, glob_pattern: str="**/*") -> int:
+        if self.__addon_root.is_file():
+            # the ZIP archive gets copied
+            return self.__addon_root.stat().st_size
+
+        zip_file_size: int = Addon.__ZIP_END_OF_CENTRAL_DIR_SIZE
+
+        current_path: Path
+        archive_path: Path
+        for current_path, archive_path in self.__iter_zip_content(glob_pattern):
+            archive_name: str = archive_path.as_posix()
+            if current_path.is_dir():
+                # directory entries end with a slash
+                archive_name += "/"
+
+            # every entry (directories included) has a local header and a central directory record,
+            # both contain the archive name
+            zip_file_size += (Addon.__ZIP_LOCAL_HEADER_SIZE + Addon.__ZIP_CENTRAL_DIR_HEADER_SIZE +
+                              2 * len(archive_name.encode(DEFAULT_FILE_ENCODING)))
+
+            if current_path.is_file():
+                # the uncompressed size is used for the compressed data
+                # (only incompressible data grows by a few bytes when it gets deflated)
+                zip_file_size += current_path.stat().st_size
+
+        return zip_file_size
+
+    def __iter_zip_content(self, glob_pattern: str) -> Iterator[Tuple[Path, Path]]:
+        # iterate over the addon directory (default glob_pattern: "**/*")
+        current_path: Path
+        for current_path in self.__addon_root.glob(glob_pattern):
+            # ignore any dotfiles / dotdirectories
+            if any(part.startswith(".") for part in current_path.parts):
+                continue
+
+            # the directory structure in the ZIP file:
+            # <addon_id>-<addon_version>.zip
+            #              |- <addon_id>/
+            #              |      |- addon.xml
+            #              |      |- ...
+
+            # the root directory in the ZIP file is named with the addon ID
+            archive_path: Path = Path(self.id)
+            # add all addon files relative to this ZIP root
+            archive_path = archive_path / current_path.relative_to(self.__addon_root)
+
+            yield current_path, archive_path
+
     def copy_assets_to_dir(self, dest_dir: Path) -> None:
-        print(f"Copying assets for addon: {self.__id}-{self.__version}")
+        print(f"Copying assets for addon: {self.id}-{self.version}")
 
         # copy addon.xml
-        if self.__addon_xml_bytes is not None:
+        addon_xml_bytes: Optional[bytes] = Addon.__get_file_bytes(self.__addon_root, Addon._ADDON_XML_FILE)
+        if addon_xml_bytes is not None:
             addon_xml_copy: BufferedWriter
             with open(dest_dir / Addon._ADDON_XML_FILE, "wb") as addon_xml_copy:
-                addon_xml_copy.write(self.__addon_xml_bytes)
+                addon_xml_copy.write(addon_xml_bytes)
 
         # copy the assets
         asset_path_str: str
-        for asset_path_str in self.__asset_path_strs:
-            asset_bytes: Optional[bytes] = self.__get_file_bytes(asset_path_str)
+        for asset_path_str in self.__metadata.asset_path_strs:
+            asset_bytes: Optional[bytes] = Addon.__get_file_bytes(self.__addon_root, asset_path_str)
 
             if asset_bytes is not None:
                 asset_copy: BufferedWriter
                 with open(dest_dir / Path(asset_path_str).name, "wb") as asset_copy:
                     asset_copy.write(asset_bytes)
 
-    def __get_file_bytes(self, file_path_str: str) -> Optional[bytes]:
+    def get_asset_sizes(self) -> Dict[str, int]:
+        # the sizes of the files that copy_assets_to_dir() would write (from the ZIP directory or the file system)
+        asset_sizes: Dict[str, int] = {}
+        asset_path_strs: Tuple[str, ...] = (Addon._ADDON_XML_FILE, *self.__metadata.asset_path_strs)
+
+        asset_path_str: str
         if self.__addon_root.is_file():
             zip_fp: ZipFile
             with ZipFile(self.__addon_root, 'r') as zip_fp:
-                try:
-                    # get the path of the compressed asset file
-                    compressed_asset_path: str = [name
-                                                    for name in zip_fp.namelist()
-                                                    if re.match(rf"^[^/]+/{re.escape(file_path_str)}$", name)
-                                                 ][0]
+                for asset_path_str in asset_path_strs:
+                    compressed_asset_path: Optional[str] = Addon.__get_zip_member_name(zip_fp, asset_path_str)
+                    if compressed_asset_path is not None:
+                        asset_sizes[Path(asset_path_str).name] = zip_fp.getinfo(compressed_asset_path).file_size
+        else:
+            for asset_path_str in asset_path_strs:
+                asset_path: Path = self.__addon_root / asset_path_str
+                if asset_path.is_file():
+                    asset_sizes[Path(asset_path_str).name] = asset_path.stat().st_size
+
+        return asset_sizes
+
+    @staticmethod
+    def __get_zip_member_name(zip_fp: ZipFile, file_path_str: str) -> Optional[str]:
+        name: str
+        for name in zip_fp.namelist():
+            if re.match(rf"^[^/]+/{re.escape(file_path_str)}$", name):
+                return name
+
+        return None
 
+    @staticmethod
+    def __get_file_bytes(addon_root: Path, file_path_str: str) -> Optional[bytes]:
+        if addon_root.is_file():
+            zip_fp: ZipFile
+            with ZipFile(addon_root, 'r') as zip_fp:
+                # get the path of the compressed asset file
+                compressed_asset_path: Optional[str] = Addon.__get_zip_member_name(zip_fp, file_path_str)
+                if compressed_asset_path is not None:
                     # read the asset file
                     compressed_asset_fp: IO[bytes]
                     with zip_fp.open(compressed_asset_path, 'r') as compressed_asset_fp:
                         return compressed_asset_fp.read()
-                except IndexError:
+                else:
                     print(f"Cannot find file '{file_path_str}' in ZIP file.")
         else:
-            file_path = self.__addon_root / file_path_str
+            file_path = addon_root / file_path_str
             if file_path.is_file():
                 asset_fp: BufferedReader
                 with open(file_path, "rb") as asset_fp:
@@ -193,30 +285,34 @@ class RepoAddon(Addon):
 
         super().__init__(addon_path=self.__repo_addon_dir)
 
-    def __create_repo_addon_xml(self, addon_xml_path: Path) -> None:
-        print("Create repository addon.xml")
+    @staticmethod
+    @cache
+    def __load_addon_xml_template() -> str:
+        # the template is read only once per process
+        import importlib_resources
+
+        return (importlib_resources.files("kodi_repo_bootstrap") / "res" / "repo_addon.xml.tpl").read_text(
+            encoding=DEFAULT_FILE_ENCODING
+        )
 
-        repo_addon_xml_template: Path
-        with importlib_resources.path("kodi_repo_bootstrap") as repo_addon_xml_template:
-            repo_addon_xml_template = (repo_addon_xml_template / "res" / "repo_addon.xml.tpl").resolve()
-
-        template_xml: str
-        with open(repo_addon_xml_template, "r", encoding=DEFAULT_FILE_ENCODING) as f:
-            template_xml = f.read()
-
-        repo_xml: str = template_xml.format(
-            addonauthor=self.__config.repo_addon_author,
-            addondescription=self.__config.repo_addon_description,
-            addonid=self.__config.repo_addon_id,
-            addonsummary=self.__config.repo_addon_summary,
-            addonversion=self.__config.repo_addon_version,
-            reponame=self.__config.repo_name,
-            repourl=self.__config.repo_url
+    @classmethod
+    def render_addon_xml(cls, config: Config) -> str:
+        return RepoAddon.__load_addon_xml_template().format(
+            addonauthor=config.repo_addon_author,
+            addondescription=config.repo_addon_description,
+            addonid=config.repo_addon_id,
+            addonsummary=config.repo_addon_summary,
+            addonversion=config.repo_addon_version,
+            reponame=config.repo_name,
+            repourl=config.repo_url
         )
 
+    def __create_repo_addon_xml(self, addon_xml_path: Path) -> None:
+        print("Create repository addon.xml")
+
         # save file
-        File.save_file(repo_xml, file_path=addon_xml_path)
+        File.save_file(RepoAddon.render_addon_xml(self.__config), file_path=addon_xml_path)
 
-    def create_zip_file(self, _dest_dir: Optional[Path]=None, _glob_pattern: str="") -> None:
+    def create_zip_file(self, _dest_dir: Optional[Path]=None, _glob_pattern: str="") -> Path:
         # add only the generated addon.xml file to
-        super().create_zip_file(dest_dir=self.__repo_addon_dir, glob_pattern="addon.xml")
+        return super().create_zip_file(dest_dir=self.__repo_addon_dir, glob_pattern="addon.xml")
@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from kodi_repo_bootstrap.addon.addon import Addon, AddonMetadata
+
+
+# shares parsed addons and packaged ZIP archives between the repositories that are created in one run
+# (the entries are bound to the size and modification time of their files, so changed files are not reused)
+class AddonCache:
+    def __init__(self) -> None:
+        # (found addon path, size, mtime) -> parsed metadata
+        self.__metadata: Dict[Tuple[Path, int, int], AddonMetadata] = {}
+
+        # (addon path, addon ID, addon version) -> (ZIP file, size, mtime)
+        self.__archives: Dict[Tuple[Path, str, str], Tuple[Path, int, int]] = {}
+
+    @staticmethod
+    def __stat_key(file_path: Path) -> Optional[Tuple[Path, int, int]]:
+        try:
+            stat: os.stat_result = file_path.stat()
+        except OSError:
+            return None
+
+        return file_path, stat.st_size, stat.st_mtime_ns
+
+    def get_metadata(self, found_file: Path) -> Optional[AddonMetadata]:
+        key: Optional[Tuple[Path, int, int]] = AddonCache.__stat_key(found_file)
+        if key is None:
+            return None
+
+        return self.__metadata.get(key)
+
+    def add_metadata(self, found_file: Path, metadata: AddonMetadata) -> None:
+        key: Optional[Tuple[Path, int, int]] = AddonCache.__stat_key(found_file)
+        if key is not None:
+            self.__metadata[key] = metadata
+
+    def get_archive(self, addon: Addon) -> Optional[Path]:
+        cached_archive: Optional[Tuple[Path, int, int]] = self.__archives.get(
+            (addon.addon_path, addon.id, str(addon.version))
+        )
+        if cached_archive is None:
+            return None
+
+        # the ZIP file must still be the one that was created before
+        if AddonCache.__stat_key(cached_archive[0]) != cached_archive:
+            return None
+
+        return cached_archive[0]
+
+    def add_archive(self, addon: Addon, zip_file_path: Path) -> None:
+        key: Optional[Tuple[Path, int, int]] = AddonCache.__stat_key(zip_file_path)
+        if key is not None:
+            self.__archives[(addon.addon_path, addon.id, str(addon.version))] = key
@@ -1,39 +1,89 @@
+import os
 from itertools import chain
 from pathlib import Path
-from typing import Dict, Iterator
+from typing import Dict, Final, Iterable, Iterator, List, Optional, Tuple
 from zipfile import BadZipFile
 
-from kodi_repo_bootstrap.addon.addon import Addon
+from kodi_repo_bootstrap.addon.addon import Addon, AddonMetadata
+from kodi_repo_bootstrap.addon.cache import AddonCache
 from kodi_repo_bootstrap.fs.dir import Directory
 
 
+def _read_addon_metadata(found_file: Path) -> Tuple[Path, Optional[AddonMetadata], Optional[str]]:
+    # this function may run in a worker process, so the expected errors are returned and not raised
+    try:
+        if found_file.suffix == ".xml":
+            return found_file, Addon.read_metadata(addon_path=found_file.parent), None
+        else:
+            return found_file, Addon.read_metadata(addon_path=found_file), None
+    except (ValueError, BadZipFile) as e:
+        return found_file, None, str(e)
+
+
 class AddonManager:
-    def __init__(self, addons_dir: Path, repo_dir: Path) -> None:
+    # below this number of addon paths, starting the worker processes takes longer than parsing
+    _PARALLEL_MIN_ADDONS: Final[int] = 16
+
+    def __init__(self, addons_dir: Path, repo_dir: Path, jobs: Optional[int]=None,
+                 cache: Optional[AddonCache]=None) -> None:
         self.__addons_dir: Path = addons_dir
         self.__repo_dir: Path = repo_dir
+        self.__jobs: Optional[int] = jobs
+        self.__cache: AddonCache = cache if cache is not None else AddonCache()
 
         # this dict should only contain the latest version of an addon
         self.__addons_latest_version: Dict[str, Addon] = {}
+        # the older versions that are skipped
+        self.__addons_superseded: List[AddonMetadata] = []
+
+        # the metadata of the addons that are already in the repository
+        self.__addons_in_repo: Optional[List[AddonMetadata]] = None
 
-    def __glob_addon(self, root_dir: Path, *glob_patterns: str) -> Iterator[Addon]:
+    def __glob_addon(self, root_dir: Path, *glob_patterns: str) -> Iterator[AddonMetadata]:
         if not root_dir.is_dir():
             raise ValueError(f"'{root_dir}' is not an existing directory.")
 
-        found_file: Path
-        for found_file in Directory.multi_glob(root_dir, *glob_patterns):
-            try:
-                if found_file.suffix == ".xml":
-                    yield Addon(addon_path=found_file.parent)
-                else:
-                    yield Addon(addon_path=found_file)
-            except (ValueError, BadZipFile) as e:
-                print(f"Skipping addon path '{found_file}'")
-                print(f"\t{str(e)}")
+        found_files: List[Path] = list(Directory.multi_glob(root_dir, *glob_patterns))
+
+        # only parse the addons that are not already known from a previous repository in this run
+        found_metadata: Dict[Path, Optional[AddonMetadata]] = {f: self.__cache.get_metadata(f) for f in found_files}
+        files_to_parse: List[Path] = [f for f, metadata in found_metadata.items() if metadata is None]
+
+        results: Iterable[Tuple[Path, Optional[AddonMetadata], Optional[str]]]
+        if self.__jobs == 1 or len(files_to_parse) < AddonManager._PARALLEL_MIN_ADDONS:
+            results = map(_read_addon_metadata, files_to_parse)
+        else:
+            # opening the ZIP files and parsing the addon.xml files is done by a pool of worker processes
+            # (multiprocessing is only imported if it is needed)
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor: ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.__jobs) as executor:
+                chunksize: int = max(1, len(files_to_parse) // ((self.__jobs or os.cpu_count() or 1) * 4))
+                results = list(executor.map(_read_addon_metadata, files_to_parse, chunksize=chunksize))
+
+        parsed_file: Path
+        metadata: Optional[AddonMetadata]
+        error: Optional[str]
+        for parsed_file, metadata, error in results:
+            if metadata is not None:
+                found_metadata[parsed_file] = metadata
+                self.__cache.add_metadata(parsed_file, metadata)
+            else:
+                print(f"Skipping addon path '{parsed_file}'")
+                print(f"\t{error}")
+
+        # keep the order of the found files
+        for metadata in found_metadata.values():
+            if metadata is not None:
+                yield metadata
 
     def get_addons_not_in_repo(self) -> Iterator[Addon]:
         if not self.__addons_latest_version:
+            latest_metadata: Dict[str, AddonMetadata] = {}
+
             # iterate over all addons in the addons_dir
-            cur_addon: Addon
+            cur_addon: AddonMetadata
             for cur_addon in self.__glob_addon(self.__addons_dir,
                                                # valid directory structure for the new addons:
                                                # addons_dir/
@@ -46,27 +96,45 @@ class AddonManager:
                                                #     |    |- plugin.addon.id-versionX.zip
                                                "*.zip", "*/addon.xml", "*/*.zip"):
                 # check if the addon is already known
-                if cur_addon.id in self.__addons_latest_version:
+                if cur_addon.id in latest_metadata:
                     # compare the version
-                    if cur_addon.version > self.__addons_latest_version[cur_addon.id].version:
+                    if cur_addon.version > latest_metadata[cur_addon.id].version:
                         # the current addon version is newer, save it in the dict
-                        self.__addons_latest_version[cur_addon.id] = cur_addon
+                        self.__addons_superseded.append(latest_metadata[cur_addon.id])
+                        latest_metadata[cur_addon.id] = cur_addon
                     else:
                         print(f"Skipping addon '{cur_addon.addon_path}', "
                               "because a newer version is present in addons_dir.")
+                        self.__addons_superseded.append(cur_addon)
                 else:
                     # add the current addon to the dict, because it's not known
-                    self.__addons_latest_version[cur_addon.id] = cur_addon
+                    latest_metadata[cur_addon.id] = cur_addon
+
+            # only the latest versions become full Addon objects
+            self.__addons_latest_version = {
+                addon_id: Addon(addon_path=metadata.addon_path, metadata=metadata)
+                for addon_id, metadata in latest_metadata.items()
+            }
 
         return iter(self.__addons_latest_version.values())
 
-    def get_addons_in_repo(self) -> Iterator[Addon]:
-        return self.__glob_addon(self.__repo_dir,
-                                 # valid directory structure for the existing addons (already in the repo):
-                                 # repo_dir/
-                                 #    |- plugin.addon.id/
-                                 #    |    |- plugin.addon.id-versionX.zip
-                                 "*/*.zip")
+    def get_superseded_addons(self) -> Iterator[AddonMetadata]:
+        # make sure that the addons_dir was scanned
+        self.get_addons_not_in_repo()
+
+        return iter(self.__addons_superseded)
+
+    def get_addons_in_repo(self) -> Iterator[AddonMetadata]:
+        if self.__addons_in_repo is None:
+            self.__addons_in_repo = list(self.__glob_addon(self.__repo_dir,
+                                                           # valid directory structure for the existing addons
+                                                           # (already in the repo):
+                                                           # repo_dir/
+                                                           #    |- plugin.addon.id/
+                                                           #    |    |- plugin.addon.id-versionX.zip
+                                                           "*/*.zip"))
+
+        return iter(self.__addons_in_repo)
 
-    def get_all_addons(self) -> Iterator[Addon]:
-        return chain(self.get_addons_not_in_repo(), self.get_addons_in_repo())
+    def get_all_addons(self) -> Iterator[AddonMetadata]:
+        return chain((a.metadata for a in self.get_addons_not_in_repo()), self.get_addons_in_repo())
@@ -1,6 +1,26 @@
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Final, Tuple, final
+from typing import Any, Dict, Final, List, Optional, Tuple, final
+
+
+def _positive_int(value: str) -> int:
+    try:
+        int_value: int = int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid int value: '{value}'")
+
+    if int_value < 1:
+        raise ArgumentTypeError(f"must be greater than 0: '{value}'")
+
+    return int_value
+
+
+class RunMode(Enum):
+    BUILD = "build"
+    VERIFY = "verify"
+    PLAN = "plan"
+    SERVE = "serve"
 
 
 @final
@@ -17,12 +37,39 @@ class CLIArgsMeta:
     ADDONS_DIR_ARG: Final[Tuple[str, str]] = ("-i", "--addons-dir")
     REPO_DIR_ARG: Final[Tuple[str, str]] = ("-o", "--repo-dir")
 
+    VERIFY_ARG: Final[str] = "--verify"
+    PLAN_ARG: Final[str] = "--plan"
+    JSON_ARG: Final[str] = "--json"
+    SERVE_ARG: Final[str] = "--serve"
+    HOST_ARG: Final[str] = "--host"
+    PORT_ARG: Final[str] = "--port"
+    JOBS_ARG: Final[Tuple[str, str]] = ("-j", "--jobs")
+
+    DEFAULT_HOST: Final[str] = "127.0.0.1"
+    DEFAULT_PORT: Final[int] = 8080
+
 
 class CLIArgs:
+    # arguments that control the run and are not part of the repository configuration
+    __RUN_ARGS: Final[Tuple[str, ...]] = (CLIArgsMeta.CONFIG_FILE_ARG, "mode", "jobs", "json", "host", "port")
+
     def __init__(self) -> None:
         parser: ArgumentParser = self.__init_parser()
         self.__args: Namespace = parser.parse_args()
 
+        # the repository settings can only be overridden for a single repository
+        if len(self.config_files) > 1 and any(v for v in self.get_args().values()):
+            parser.error("repository settings can only be passed as arguments together with a single config file")
+        if len(self.config_files) > 1 and self.mode == RunMode.SERVE:
+            parser.error(f"{CLIArgsMeta.SERVE_ARG} only works with a single config file")
+
+        # the options of a run mode must not be silently ignored in the other modes
+        if self.json and self.mode != RunMode.PLAN:
+            parser.error(f"{CLIArgsMeta.JSON_ARG} only works together with {CLIArgsMeta.PLAN_ARG}")
+        if (self.__args.host is not None or self.__args.port is not None) and self.mode != RunMode.SERVE:
+            parser.error(f"{CLIArgsMeta.HOST_ARG} and {CLIArgsMeta.PORT_ARG} only work together with "
+                         f"{CLIArgsMeta.SERVE_ARG}")
+
     def __init_parser(self) -> ArgumentParser:
         parser: ArgumentParser = ArgumentParser(description="Create a Kodi repository")
 
@@ -49,10 +96,61 @@ class CLIArgs:
         parser.add_argument(*CLIArgsMeta.REPO_DIR_ARG, metavar='Repository directory', type=Path, dest='repo_dir',
                             help="The output directory of the new Kodi repository")
 
+        # the run mode (default: build the repository)
+        mode_group = parser.add_mutually_exclusive_group()
+        mode_group.add_argument(CLIArgsMeta.VERIFY_ARG, action='store_const', const=RunMode.VERIFY, dest='mode',
+                                help=("Do not build the repository, but check the integrity of the ZIP archives "
+                                      "and their md5 files in the repository directory"))
+        mode_group.add_argument(CLIArgsMeta.PLAN_ARG, action='store_const', const=RunMode.PLAN, dest='mode',
+                                help=("Do not build the repository, but show which addons would be packaged, skipped, "
+                                      "pruned or kept (nothing is written to disk)"))
+        mode_group.add_argument(CLIArgsMeta.SERVE_ARG, action='store_const', const=RunMode.SERVE, dest='mode',
+                                help="Do not build the repository, but serve the repository directory via HTTP")
+        parser.set_defaults(mode=RunMode.BUILD)
+
+        parser.add_argument(CLIArgsMeta.JSON_ARG, action='store_true', dest='json',
+                            help=f"Print the result of {CLIArgsMeta.PLAN_ARG} as JSON")
+
+        # no defaults here, so that it can be detected if they are passed without --serve
+        parser.add_argument(CLIArgsMeta.HOST_ARG, metavar='Host', type=str, dest='host',
+                            help=(f"The address the HTTP server of {CLIArgsMeta.SERVE_ARG} listens on "
+                                  f"(default: {CLIArgsMeta.DEFAULT_HOST})"))
+        parser.add_argument(CLIArgsMeta.PORT_ARG, metavar='Port', type=int, dest='port',
+                            help=(f"The port of the HTTP server of {CLIArgsMeta.SERVE_ARG} "
+                                  f"(default: {CLIArgsMeta.DEFAULT_PORT})"))
+        parser.add_argument(*CLIArgsMeta.JOBS_ARG, metavar='Jobs', type=_positive_int, dest='jobs',
+                            help="The number of worker processes (default: number of CPUs)")
+
         parser.add_argument(CLIArgsMeta.CONFIG_FILE_ARG, metavar=CLIArgsMeta.CONFIG_FILE_ARG.upper(), type=Path,
-                            help="The configuration file")
+                            nargs='+',
+                            help=("The configuration file. If multiple files are passed, all repositories are "
+                                  "created in one run and share the parsed and packaged addons"))
 
         return parser
 
+    @property
+    def config_files(self) -> List[Path]:
+        return getattr(self.__args, CLIArgsMeta.CONFIG_FILE_ARG)
+
+    @property
+    def mode(self) -> RunMode:
+        return self.__args.mode
+
+    @property
+    def json(self) -> bool:
+        return self.__args.json
+
+    @property
+    def host(self) -> str:
+        return self.__args.host if self.__args.host is not None else CLIArgsMeta.DEFAULT_HOST
+
+    @property
+    def port(self) -> int:
+        return self.__args.port if self.__args.port is not None else CLIArgsMeta.DEFAULT_PORT
+
+    @property
+    def jobs(self) -> Optional[int]:
+        return self.__args.jobs
+
     def get_args(self) -> Dict[str, Any]:
-        return vars(self.__args)
+        return {k: v for k, v in vars(self.__args).items() if k not in CLIArgs.__RUN_ARGS}
@@ -6,9 +6,13 @@ DEFAULT_FILE_ENCODING: Final[str] = "utf-8"
 
 
 class File:
+    @classmethod
+    def get_md5_file_path(cls, original_file_path: Path) -> Path:
+        return original_file_path.with_name(original_file_path.name + ".md5")
+
     @classmethod
     def create_md5_file(cls, original_file_path: Path) -> None:
-        md5_file_path: Path = original_file_path.with_name(original_file_path.name + ".md5")
+        md5_file_path: Path = cls.get_md5_file_path(original_file_path)
         print(f"Generating {md5_file_path.name} file")
 
         hash_md5 = hashlib.md5()
@@ -1,14 +1,98 @@
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from kodi_repo_bootstrap.cli.args import CLIArgs, RunMode
 from kodi_repo_bootstrap.repo.config import Config, ConfigFile
-from kodi_repo_bootstrap.repo.manager import RepoManager
+
+# the modules of the single run modes are only imported when they are needed to keep the startup fast
+
+
+def build_repos(configs: Iterable[Config], jobs: Optional[int]=None) -> None:
+    from kodi_repo_bootstrap.addon.cache import AddonCache
+    from kodi_repo_bootstrap.repo.manager import RepoManager
+
+    # all repositories share the parsed addons and the packaged ZIP files
+    addon_cache: AddonCache = AddonCache()
+
+    config: Config
+    for config in configs:
+        print(f"Creating repository: {config.repo_name}")
+
+        # create the Kodi repository
+        repo_manager: RepoManager = RepoManager(config, jobs=jobs, cache=addon_cache)
+        repo_manager.create_repo_addons_xml()
+        repo_manager.copy_addon_assets_to_repo()
+        repo_manager.create_addon_zip_files()
+
+
+def verify_repos(configs: Iterable[Config], jobs: Optional[int]=None) -> bool:
+    from kodi_repo_bootstrap.repo.verify import RepoVerifier
+
+    all_verified: bool = True
+
+    config: Config
+    for config in configs:
+        # check the integrity of an existing Kodi repository
+        repo_verifier: RepoVerifier = RepoVerifier(config.repo_dir, jobs=jobs)
+        all_verified = repo_verifier.verify() and all_verified
+
+    return all_verified
+
+
+def plan_repos(configs: Iterable[Config], jobs: Optional[int]=None, as_json: bool=False) -> None:
+    import json
+    from contextlib import redirect_stdout
+
+    from kodi_repo_bootstrap.addon.cache import AddonCache
+    from kodi_repo_bootstrap.repo.plan import PlanEntry, RepoPlanner
+
+    addon_cache: AddonCache = AddonCache()
+    repo_plans: List[Dict[str, Any]] = []
+
+    config: Config
+    for config in configs:
+        repo_planner: RepoPlanner = RepoPlanner(config, jobs=jobs, cache=addon_cache)
+
+        if as_json:
+            # keep stdout clean for the JSON output
+            with redirect_stdout(sys.stderr):
+                plan_entries: List[PlanEntry] = repo_planner.plan()
+            repo_plans.append(repo_planner.plan_as_dict(plan_entries))
+        else:
+            repo_planner.print_plan(repo_planner.plan())
+
+    if as_json:
+        print(json.dumps(repo_plans, indent=4))
+
+
+def serve_repo(config: Config, host: str, port: int) -> None:
+    from kodi_repo_bootstrap.repo.server import RepoServer
+
+    RepoServer(config.repo_dir, host=host, port=port).serve_forever()
 
 
 def run() -> None:
-    # load configuration
-    config_file: ConfigFile = ConfigFile()
-    config: Config = config_file.get_config()
-
-    # create the Kodi repository
-    repo_manager: RepoManager = RepoManager(config)
-    repo_manager.create_repo_addons_xml()
-    repo_manager.copy_addon_assets_to_repo()
-    repo_manager.create_addon_zip_files()
+    # parse the CLI arguments
+    cli_args: CLIArgs = CLIArgs()
+
+    # load the configuration of every repository before doing anything
+    configs: List[Config] = []
+    config_file_path: Path
+    for config_file_path in cli_args.config_files:
+        # only the build mode saves the config file
+        config_file: ConfigFile = ConfigFile(config_file_path, cli_args, read_only=cli_args.mode != RunMode.BUILD)
+        configs.append(config_file.get_config())
+
+    if cli_args.mode == RunMode.VERIFY:
+        if not verify_repos(configs, jobs=cli_args.jobs):
+            sys.exit(1)
+        return
+    if cli_args.mode == RunMode.PLAN:
+        plan_repos(configs, jobs=cli_args.jobs, as_json=cli_args.json)
+        return
+    if cli_args.mode == RunMode.SERVE:
+        serve_repo(configs[0], host=cli_args.host, port=cli_args.port)
+        return
+
+    build_repos(configs, jobs=cli_args.jobs)
@@ -3,7 +3,7 @@ import json
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional
 from urllib.parse import ParseResult, urlparse
 
 from kodi_repo_bootstrap.cli.args import CLIArgs, CLIArgsMeta
@@ -89,11 +89,12 @@ class Config:
 
 
 class ConfigFile:
-    def __init__(self):
+    def __init__(self, config_file: Path, cli_args: CLIArgs, read_only: bool=False) -> None:
         # get the config from the CLI arguments
-        config_dict: Dict[str, Any] = CLIArgs().get_args()
+        config_dict: Dict[str, Any] = cli_args.get_args()
 
-        self.__config_file: Path = cast(Path, config_dict.pop(CLIArgsMeta.CONFIG_FILE_ARG)).resolve()
+        self.__config_file: Path = config_file.resolve()
+        self.__read_only: bool = read_only
 
         # get the settings from the config file
         config_dict_from_file: Dict[str, Any] = self.__read_config_file(self.__config_file)
@@ -105,11 +106,15 @@ class ConfigFile:
         self.__config: Config = Config(**config_dict_from_file)
 
         # save the config to file
-        self.__write_config_file(self.__config)
+        if not self.__read_only:
+            self.__write_config_file(self.__config)
 
     def __read_config_file(self, file_path: Path) -> Dict[str, Any]:
         # check if a config file exists
         if not file_path.is_file():
+            if self.__read_only:
+                return {}
+
             # create a new one if no config file exists
             with open(file_path, 'w', encoding=DEFAULT_FILE_ENCODING) as f:
                 json.dump({}, f)
@@ -1,9 +1,10 @@
 from itertools import chain
 import shutil
 from pathlib import Path
-from typing import Dict, Iterator, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from kodi_repo_bootstrap.addon.addon import Addon, RepoAddon
+from kodi_repo_bootstrap.addon.addon import Addon, AddonMetadata, RepoAddon
+from kodi_repo_bootstrap.addon.cache import AddonCache
 from kodi_repo_bootstrap.addon.manager import AddonManager
 from kodi_repo_bootstrap.fs.dir import Directory
 from kodi_repo_bootstrap.fs.file import File
@@ -12,11 +13,14 @@ from kodi_repo_bootstrap.repo.version import SemanticVersion
 
 
 class RepoManager:
-    def __init__(self, config: Config) -> None:
+    def __init__(self, config: Config, jobs: Optional[int]=None, cache: Optional[AddonCache]=None) -> None:
         self.__config: Config = config
+        self.__cache: AddonCache = cache if cache is not None else AddonCache()
 
         self.__addons_manager: AddonManager = AddonManager(addons_dir=config.addons_dir,
-                                                           repo_dir=config.repo_dir)
+                                                           repo_dir=config.repo_dir,
+                                                           jobs=jobs,
+                                                           cache=self.__cache)
 
         self.__repo_addon: RepoAddon = RepoAddon(config)
 
@@ -37,10 +41,10 @@ class RepoManager:
         addons_xml_data: str = '<?xml version="1.0" encoding="UTF-8"?>\n<addons>\n'
 
         # store the content of all addon.xml files
-        addon_xml_files: Dict[str, Dict[SemanticVersion, List[str]]] = {}
+        addon_xml_files: Dict[str, Dict[SemanticVersion, Tuple[str, ...]]] = {}
 
         # get the addon.xml from the new and previous addon versions
-        addon: Addon
+        addon: AddonMetadata
         for addon in self.__addons_manager.get_all_addons():
             if addon.id in addon_xml_files:
                 addon_xml_files[addon.id][addon.version] = addon.addon_xml_lines
@@ -48,9 +52,9 @@ class RepoManager:
                 addon_xml_files[addon.id] = {addon.version: addon.addon_xml_lines}
 
         # iterate over all found addon.xml files
-        addon_versions: Dict[SemanticVersion, List[str]]
+        addon_versions: Dict[SemanticVersion, Tuple[str, ...]]
         for addon_versions in addon_xml_files.values():
-            addon_xml_lines: List[str]
+            addon_xml_lines: Tuple[str, ...]
             for addon_xml_lines in addon_versions.values():
                 # new addon
                 addon_xml_data: str = ""
@@ -81,10 +85,11 @@ class RepoManager:
     def copy_addon_assets_to_repo(self) -> None:
         # get the addon ZIP and their corresponding md5 files
         # (for excluding them later from being deleted)
-        previous_addon_zip_md5_files: Iterator[str] = chain.from_iterable(
-            chain((a.addon_path.name, f"{a.addon_path.name}.md5"))
+        # (this must be a list, because it's used for every addon directory)
+        previous_addon_zip_md5_files: List[str] = list(chain.from_iterable(
+            (a.addon_path.name, File.get_md5_file_path(a.addon_path).name)
                 for a in self.__addons_manager.get_addons_in_repo()
-        )
+        ))
 
         # iterate over the addon directories
         addon: Addon
@@ -109,4 +114,16 @@ class RepoManager:
         addon: Addon
         addon_out_path: Path
         for addon, addon_out_path in self.__addons_not_in_repo_with_out_path:
-            addon.create_zip_file(dest_dir=addon_out_path)
+            # reuse the ZIP file if it was already created for another repository in this run
+            cached_zip_file_path: Optional[Path] = self.__cache.get_archive(addon)
+            if cached_zip_file_path is not None:
+                zip_file_path: Path = addon_out_path / cached_zip_file_path.name
+                if zip_file_path != cached_zip_file_path:
+                    print(f"Reusing zip file for addon: {addon.id}-{addon.version}")
+
+                    shutil.copy2(src=cached_zip_file_path, dst=zip_file_path)
+                    shutil.copy2(src=File.get_md5_file_path(cached_zip_file_path),
+                                 dst=File.get_md5_file_path(zip_file_path))
+                    continue
+
+            self.__cache.add_archive(addon, addon.create_zip_file(dest_dir=addon_out_path))
@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from enum import Enum
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Final, List, Optional, Set
+
+from kodi_repo_bootstrap.addon.addon import Addon, AddonMetadata, RepoAddon
+from kodi_repo_bootstrap.addon.cache import AddonCache
+from kodi_repo_bootstrap.addon.manager import AddonManager
+from kodi_repo_bootstrap.fs.dir import Directory
+from kodi_repo_bootstrap.fs.file import DEFAULT_FILE_ENCODING, File
+from kodi_repo_bootstrap.repo.config import Config
+
+
+class PlanAction(Enum):
+    PACKAGE = "package"
+    SKIP = "skip"
+    PRUNE = "prune"
+    KEEP = "keep"
+
+
+@dataclass(frozen=True)
+class PlanEntry:
+    action: PlanAction
+    path: Path
+    addon_id: Optional[str]
+    version: Optional[str]
+    # estimated number of bytes that would be written for this entry
+    bytes_to_write: int
+    reason: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "action": self.action.value,
+            "path": str(self.path),
+            "addon_id": self.addon_id,
+            "version": self.version,
+            "bytes_to_write": self.bytes_to_write,
+            "reason": self.reason
+        }
+
+
+class RepoPlanner:
+    # an md5 file contains the hex digest
+    _MD5_FILE_SIZE: Final[int] = 32
+
+    def __init__(self, config: Config, jobs: Optional[int]=None, cache: Optional[AddonCache]=None) -> None:
+        self.__config: Config = config
+
+        # the planner only reads metadata, so nothing must be created in the repo_dir (unlike the RepoManager)
+        self.__addons_manager: AddonManager = AddonManager(addons_dir=config.addons_dir,
+                                                           repo_dir=config.repo_dir,
+                                                           jobs=jobs,
+                                                           cache=cache)
+
+    def plan(self) -> List[PlanEntry]:
+        repo_dir: Path = self.__config.repo_dir
+
+        addons_not_in_repo: List[Addon] = list(self.__addons_manager.get_addons_not_in_repo())
+        addons_in_repo: List[AddonMetadata] = list(self.__addons_manager.get_addons_in_repo()) \
+            if repo_dir.is_dir() else []
+
+        plan_entries: List[PlanEntry] = [self.__plan_repo_addon(),
+                                         self.__plan_addons_xml(addons_not_in_repo, addons_in_repo)]
+
+        # the addons that would be (re-)packaged
+        packaged_zip_files: Set[Path] = {self.__get_repo_addon_zip_file_path()}
+
+        # the ZIP and md5 files of the addons in the repo are not deleted by RepoManager.copy_addon_assets_to_repo()
+        previous_addon_zip_md5_files: List[str] = list(chain.from_iterable(
+            (a.addon_path.name, File.get_md5_file_path(a.addon_path).name)
+                for a in addons_in_repo
+        ))
+
+        addon: Addon
+        for addon in addons_not_in_repo:
+            addon_out_path: Path = repo_dir / addon.id
+            zip_file_path: Path = addon_out_path / addon.zip_file_name
+            packaged_zip_files.add(zip_file_path)
+
+            asset_sizes: Dict[str, int] = addon.get_asset_sizes()
+
+            plan_entries.append(PlanEntry(
+                action=PlanAction.PACKAGE,
+                path=zip_file_path,
+                addon_id=addon.id,
+                version=str(addon.version),
+                bytes_to_write=(addon.estimate_zip_file_size() + RepoPlanner._MD5_FILE_SIZE +
+                                sum(asset_sizes.values())),
+                reason=("replaces the existing ZIP file" if zip_file_path.is_file() else "new addon version") +
+                       f" (from '{addon.addon_path}')"
+            ))
+
+            # everything else in the addon directory gets deleted before the assets are copied
+            if addon_out_path.is_dir():
+                path_to_delete: Path
+                for path_to_delete in Directory.multi_glob_exclude(addon_out_path, *previous_addon_zip_md5_files):
+                    # the assets are written again
+                    if path_to_delete.relative_to(addon_out_path).as_posix() in asset_sizes:
+                        continue
+
+                    plan_entries.append(PlanEntry(
+                        action=PlanAction.PRUNE,
+                        path=path_to_delete,
+                        addon_id=addon.id,
+                        version=None,
+                        bytes_to_write=0,
+                        reason="not an asset of the new addon version"
+                    ))
+
+        superseded_addon: AddonMetadata
+        for superseded_addon in self.__addons_manager.get_superseded_addons():
+            plan_entries.append(PlanEntry(
+                action=PlanAction.SKIP,
+                path=superseded_addon.addon_path,
+                addon_id=superseded_addon.id,
+                version=str(superseded_addon.version),
+                bytes_to_write=0,
+                reason="a newer version is present in addons_dir"
+            ))
+
+        repo_addon: AddonMetadata
+        for repo_addon in addons_in_repo:
+            if repo_addon.addon_path in packaged_zip_files:
+                continue
+
+            plan_entries.append(PlanEntry(
+                action=PlanAction.KEEP,
+                path=repo_addon.addon_path,
+                addon_id=repo_addon.id,
+                version=str(repo_addon.version),
+                bytes_to_write=0,
+                reason="previous addon version in the repository"
+            ))
+
+        return plan_entries
+
+    def plan_as_dict(self, plan_entries: List[PlanEntry]) -> Dict[str, Any]:
+        return {
+            "repo_name": self.__config.repo_name,
+            "repo_dir": str(self.__config.repo_dir),
+            "bytes_to_write": sum(e.bytes_to_write for e in plan_entries),
+            "entries": [e.as_dict() for e in plan_entries]
+        }
+
+    def print_plan(self, plan_entries: List[PlanEntry]) -> None:
+        print(f"Build plan for repository '{self.__config.repo_name}': '{self.__config.repo_dir}'")
+
+        plan_entry: PlanEntry
+        for plan_entry in plan_entries:
+            line: str = f"\t{plan_entry.action.value:<8} {plan_entry.path}"
+            if plan_entry.bytes_to_write:
+                line += f" (~{plan_entry.bytes_to_write} bytes)"
+            print(f"{line}\n\t\t{plan_entry.reason}")
+
+        print(", ".join(f"{sum(1 for e in plan_entries if e.action == action)} to {action.value}"
+                        for action in PlanAction) +
+              f"; about {sum(e.bytes_to_write for e in plan_entries)} bytes to write.")
+
+    def __get_repo_addon_zip_file_path(self) -> Path:
+        return (self.__config.repo_dir / self.__config.repo_addon_id /
+                f"{self.__config.repo_addon_id}-{self.__config.repo_addon_version}.zip")
+
+    def __plan_repo_addon(self) -> PlanEntry:
+        repo_addon_xml_size: int = len(RepoAddon.render_addon_xml(self.__config).encode(DEFAULT_FILE_ENCODING))
+
+        return PlanEntry(
+            action=PlanAction.PACKAGE,
+            path=self.__get_repo_addon_zip_file_path(),
+            addon_id=self.__config.repo_addon_id,
+            version=self.__config.repo_addon_version,
+            # addon.xml + the ZIP file containing it + md5 file
+            bytes_to_write=2 * repo_addon_xml_size + RepoPlanner._MD5_FILE_SIZE,
+            reason="repository addon"
+        )
+
+    def __plan_addons_xml(self, addons_not_in_repo: List[Addon], addons_in_repo: List[AddonMetadata]) -> PlanEntry:
+        # the addons.xml file contains the addon.xml files of all addons
+        addons_xml_size: int = sum(len(line.encode(DEFAULT_FILE_ENCODING))
+                                   for addon in chain((a.metadata for a in addons_not_in_repo), addons_in_repo)
+                                   for line in addon.addon_xml_lines)
+
+        return PlanEntry(
+            action=PlanAction.PACKAGE,
+            path=self.__config.repo_dir / "addons.xml",
+            addon_id=None,
+            version=None,
+            bytes_to_write=addons_xml_size + RepoPlanner._MD5_FILE_SIZE,
+            reason="index of all addons"
+        )
@@ -0,0 +1,341 @@
+import asyncio
+import gzip
+import mimetypes
+import os
+import re
+from asyncio import StreamReader, StreamWriter
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from re import Match, Pattern
+from typing import BinaryIO, Dict, Final, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from kodi_repo_bootstrap.fs.file import DEFAULT_FILE_ENCODING, File
+
+
+@dataclass(frozen=True)
+class _FileInfo:
+    file_path: Path
+    size: int
+    mtime_ns: int
+    etag: str
+    last_modified: str
+    content_type: str
+    # only set for the gzip-encoded addons.xml file
+    gzip_body: Optional[bytes] = None
+    gzip_etag: Optional[str] = None
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, headers: Optional[Dict[str, str]]=None) -> None:
+        super().__init__(status)
+        self.status: int = status
+        self.headers: Dict[str, str] = headers if headers is not None else {}
+
+
+class RepoServer:
+    _ADDONS_XML_FILE: Final[str] = "addons.xml"
+
+    __MAX_HEADERS: Final[int] = 100
+    # a lower level than the default (9) is almost as small, but much faster
+    __GZIP_COMPRESS_LEVEL: Final[int] = 6
+    __RANGE_REGEX: Final[Pattern] = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+    __REASONS: Final[Dict[int, str]] = {
+        200: "OK",
+        206: "Partial Content",
+        304: "Not Modified",
+        400: "Bad Request",
+        404: "Not Found",
+        405: "Method Not Allowed",
+        416: "Range Not Satisfiable"
+    }
+
+    def __init__(self, repo_dir: Path, host: str, port: int) -> None:
+        self.__repo_dir: Path = repo_dir.resolve()
+        self.__host: str = host
+        self.__port: int = port
+
+        # file information (ETag, precompressed addons.xml, ...) of the already requested files
+        self.__file_infos: Dict[Path, _FileInfo] = {}
+
+    def serve_forever(self) -> None:
+        try:
+            asyncio.run(self.__serve())
+        except KeyboardInterrupt:
+            print("Server stopped")
+
+    async def __serve(self) -> None:
+        server: asyncio.Server = await asyncio.start_server(self.__handle_connection, self.__host, self.__port)
+        print(f"Serving '{self.__repo_dir}' on http://{self.__host}:{self.__port}/")
+
+        async with server:
+            await server.serve_forever()
+
+    async def __handle_connection(self, reader: StreamReader, writer: StreamWriter) -> None:
+        try:
+            keep_alive: bool = True
+            while keep_alive:
+                request_line: bytes = await self.__read_line(reader)
+                if not request_line:
+                    # the client closed the connection
+                    break
+
+                headers: Dict[str, str] = {}
+                header_line: bytes
+                while (header_line := await self.__read_line(reader)) not in (b"\r\n", b"\n", b""):
+                    if len(headers) >= RepoServer.__MAX_HEADERS:
+                        raise _HTTPError(400)
+
+                    name, _, value = header_line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    raise _HTTPError(400)
+
+                # HTTP/1.1 keeps the connection open by default, HTTP/1.0 only on request
+                connection: str = headers.get("connection", "").lower()
+                keep_alive = (connection != "close") if version == "HTTP/1.1" else (connection == "keep-alive")
+
+                # request bodies are not read, so the connection cannot be used for further requests
+                if headers.get("content-length", "0") != "0" or "transfer-encoding" in headers:
+                    keep_alive = False
+
+                await self.__handle_request(writer, method, target, headers, keep_alive)
+        except _HTTPError as e:
+            await self.__send_error(writer, e, keep_alive=False, send_body=True)
+        except ConnectionError:
+            # the client closed the connection while the response was sent
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def __handle_request(self, writer: StreamWriter, method: str, target: str, headers: Dict[str, str],
+                               keep_alive: bool) -> None:
+        try:
+            if method not in ("GET", "HEAD"):
+                raise _HTTPError(405, {"Allow": "GET, HEAD"})
+
+            file_info: _FileInfo = await self.__get_file_info(self.__get_target_path(target))
+
+            use_gzip: bool = file_info.gzip_body is not None and self.__accepts_gzip(headers)
+            etag: str = file_info.gzip_etag if use_gzip and file_info.gzip_etag else file_info.etag
+            size: int = len(file_info.gzip_body) if use_gzip and file_info.gzip_body else file_info.size
+
+            response_headers: Dict[str, str] = {
+                "Content-Type": file_info.content_type,
+                "ETag": etag,
+                "Last-Modified": file_info.last_modified,
+                "Accept-Ranges": "bytes"
+            }
+            if file_info.gzip_body is not None:
+                response_headers["Vary"] = "Accept-Encoding"
+            if use_gzip:
+                response_headers["Content-Encoding"] = "gzip"
+
+            if self.__is_not_modified(headers, etag, file_info):
+                await self.__send_head(writer, 304, response_headers, keep_alive)
+                return
+
+            status: int = 200
+            start: int = 0
+            end: int = size - 1
+            byte_range: Optional[Tuple[int, int]] = self.__get_range(headers, etag, file_info, size)
+            if byte_range is not None:
+                status = 206
+                start, end = byte_range
+                response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+            response_headers["Content-Length"] = str(end - start + 1)
+            await self.__send_head(writer, status, response_headers, keep_alive)
+
+            if method == "HEAD" or end < start:
+                return
+
+            if use_gzip and file_info.gzip_body is not None:
+                writer.write(file_info.gzip_body[start:end + 1])
+                await writer.drain()
+            else:
+                # the file content is sent by the kernel if possible (falls back to read/write)
+                loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+                f: BinaryIO = await loop.run_in_executor(None, open, file_info.file_path, "rb")
+                with f:
+                    await loop.sendfile(writer.transport, f, start, end - start + 1)
+        except _HTTPError as e:
+            await self.__send_error(writer, e, keep_alive, send_body=method != "HEAD")
+
+    @staticmethod
+    async def __read_line(reader: StreamReader) -> bytes:
+        try:
+            return await reader.readline()
+        except ValueError:
+            # the line is longer than the limit of the stream reader
+            raise _HTTPError(400)
+
+    def __get_target_path(self, target: str) -> Path:
+        path_parts: List[str] = [p for p in unquote(urlsplit(target).path).split("/") if p]
+
+        # a path cannot contain null bytes
+        if any("\0" in p for p in path_parts):
+            raise _HTTPError(400)
+
+        # do not serve hidden files (e.g. .git) or anything outside of the repo_dir
+        if any(p.startswith(".") or "\\" in p for p in path_parts):
+            raise _HTTPError(404)
+
+        return self.__repo_dir.joinpath(*path_parts)
+
+    async def __get_file_info(self, file_path: Path) -> _FileInfo:
+        # the file system access and the compression must not block the event loop
+        file_info: _FileInfo = await asyncio.get_running_loop().run_in_executor(None, self.__load_file_info, file_path,
+                                                                              self.__file_infos.get(file_path))
+        self.__file_infos[file_path] = file_info
+
+        return file_info
+
+    def __load_file_info(self, file_path: Path, cached_file_info: Optional[_FileInfo]) -> _FileInfo:
+        # this method runs in a worker thread
+        try:
+            if not file_path.resolve().is_relative_to(self.__repo_dir) or not file_path.is_file():
+                raise _HTTPError(404)
+
+            stat: os.stat_result = file_path.stat()
+        except (OSError, ValueError):
+            raise _HTTPError(404)
+
+        if cached_file_info is not None and \
+                cached_file_info.size == stat.st_size and cached_file_info.mtime_ns == stat.st_mtime_ns:
+            return cached_file_info
+
+        etag: str = self.__get_md5_etag(file_path, stat) or f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+        gzip_body: Optional[bytes] = None
+        gzip_etag: Optional[str] = None
+        if file_path == self.__repo_dir / RepoServer._ADDONS_XML_FILE:
+            # precompress the addons.xml file once per version
+            try:
+                gzip_body = gzip.compress(file_path.read_bytes(), compresslevel=RepoServer.__GZIP_COMPRESS_LEVEL,
+                                          mtime=0)
+            except OSError:
+                raise _HTTPError(404)
+            gzip_etag = f'{etag[:-1]}-gzip"'
+
+        content_type: str = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith("xml"):
+            content_type += f"; charset={DEFAULT_FILE_ENCODING}"
+
+        return _FileInfo(file_path=file_path,
+                         size=stat.st_size,
+                         mtime_ns=stat.st_mtime_ns,
+                         etag=etag,
+                         last_modified=formatdate(stat.st_mtime, usegmt=True),
+                         content_type=content_type,
+                         gzip_body=gzip_body,
+                         gzip_etag=gzip_etag)
+
+    @staticmethod
+    def __get_md5_etag(file_path: Path, stat: os.stat_result) -> Optional[str]:
+        md5_file_path: Path = File.get_md5_file_path(file_path)
+        try:
+            # the md5 file is created after the file, so an older md5 file is outdated
+            if md5_file_path.stat().st_mtime_ns < stat.st_mtime_ns:
+                return None
+
+            md5_digest: str = md5_file_path.read_text(encoding=DEFAULT_FILE_ENCODING).strip().lower()
+        except OSError:
+            return None
+
+        if not re.fullmatch(r"[0-9a-f]{32}", md5_digest):
+            return None
+
+        return f'"{md5_digest}"'
+
+    @staticmethod
+    def __accepts_gzip(headers: Dict[str, str]) -> bool:
+        coding: str
+        for coding in headers.get("accept-encoding", "").lower().split(","):
+            name, _, params = coding.partition(";")
+            if name.strip() == "gzip":
+                return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+
+        return False
+
+    @staticmethod
+    def __is_not_modified(headers: Dict[str, str], etag: str, file_info: _FileInfo) -> bool:
+        if "if-none-match" in headers:
+            # weak comparison
+            if_none_match: List[str] = [t.strip().removeprefix("W/") for t in headers["if-none-match"].split(",")]
+            return "*" in if_none_match or etag.removeprefix("W/") in if_none_match
+
+        if "if-modified-since" in headers:
+            try:
+                return int(file_info.mtime_ns // 1_000_000_000) <= \
+                    int(parsedate_to_datetime(headers["if-modified-since"]).timestamp())
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+    @staticmethod
+    def __get_range(headers: Dict[str, str], etag: str, file_info: _FileInfo, size: int) -> Optional[Tuple[int, int]]:
+        if "range" not in headers:
+            return None
+
+        # the range only applies if the representation did not change (strong comparison)
+        if_range: Optional[str] = headers.get("if-range")
+        if if_range is not None and (etag.startswith("W/") or
+                                     (if_range != etag and if_range != file_info.last_modified)):
+            return None
+
+        # multiple ranges are not supported, the whole file is sent instead
+        range_match: Optional[Match] = RepoServer.__RANGE_REGEX.match(headers["range"].replace(" ", ""))
+        if range_match is None or (not range_match["start"] and not range_match["end"]):
+            return None
+
+        start: int
+        end: int
+        if not range_match["start"]:
+            # suffix range: the last n bytes
+            start = max(0, size - int(range_match["end"]))
+            end = size - 1
+        else:
+            start = int(range_match["start"])
+            if range_match["end"] and int(range_match["end"]) < start:
+                # an invalid range is ignored and the whole file is sent
+                return None
+            end = min(int(range_match["end"]), size - 1) if range_match["end"] else size - 1
+
+        # only a range that starts beyond the end of the file cannot be satisfied
+        if start >= size:
+            raise _HTTPError(416, {"Content-Range": f"bytes */{size}"})
+
+        return start, end
+
+    async def __send_head(self, writer: StreamWriter, status: int, headers: Dict[str, str], keep_alive: bool) -> None:
+        head: str = f"HTTP/1.1 {status} {RepoServer.__REASONS[status]}\r\n"
+        head += f"Date: {formatdate(usegmt=True)}\r\n"
+        head += f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+
+        writer.write(head.encode("latin-1") + b"\r\n")
+        await writer.drain()
+
+    async def __send_error(self, writer: StreamWriter, error: _HTTPError, keep_alive: bool, send_body: bool) -> None:
+        body: bytes = f"{error.status} {RepoServer.__REASONS[error.status]}\n".encode("latin-1")
+
+        headers: Dict[str, str] = {
+            "Content-Type": "text/plain",
+            "Content-Length": str(len(body))
+        }
+        headers.update(error.headers)
+
+        await self.__send_head(writer, error.status, headers, keep_alive)
+        if send_body:
+            writer.write(body)
+            await writer.drain()
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, Final, List, Optional, cast
+from zipfile import BadZipFile, ZipFile
+
+from kodi_repo_bootstrap.fs.dir import Directory
+from kodi_repo_bootstrap.fs.file import DEFAULT_FILE_ENCODING, File
+
+
+@dataclass(frozen=True)
+class VerifyResult:
+    file_path: Path
+    size: int
+    mtime_ns: int
+    md5_mtime_ns: int
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def cache_entry(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "md5_mtime_ns": self.md5_mtime_ns
+        }
+
+
+def _verify_file(file_path: Path) -> VerifyResult:
+    # this function runs in a worker process, so errors are returned and not raised
+    md5_file_path: Path = File.get_md5_file_path(file_path)
+    try:
+        stat: os.stat_result = file_path.stat()
+        md5_mtime_ns: int = md5_file_path.stat().st_mtime_ns if md5_file_path.is_file() else -1
+    except OSError as e:
+        return VerifyResult(file_path=file_path, size=-1, mtime_ns=-1, md5_mtime_ns=-1, error=str(e))
+
+    def result(error: Optional[str]=None) -> VerifyResult:
+        return VerifyResult(file_path=file_path,
+                            size=stat.st_size,
+                            mtime_ns=stat.st_mtime_ns,
+                            md5_mtime_ns=md5_mtime_ns,
+                            error=error)
+
+    if md5_mtime_ns < 0:
+        return result(f"missing md5 file '{md5_file_path.name}'")
+    if stat.st_size == 0:
+        return result("empty file")
+
+    try:
+        with open(md5_file_path, "r", encoding=DEFAULT_FILE_ENCODING) as md5_fp:
+            expected_md5: str = md5_fp.read().strip().lower()
+
+        with open(file_path, "rb") as file_fp, \
+                mmap.mmap(file_fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            # md5 digest over the whole mapped file at once
+            if hashlib.md5(mapped_file).hexdigest() != expected_md5:
+                return result(f"md5 digest does not match '{md5_file_path.name}'")
+
+            if file_path.suffix == ".zip":
+                # read every member of the archive, this checks the CRCs
+                # (ZipFile needs a seekable file object, mmap has seekable() only since Python 3.13)
+                zip_fp: ZipFile
+                with ZipFile(cast(IO[bytes], mapped_file), 'r') as zip_fp:
+                    bad_member: Optional[str] = zip_fp.testzip()
+                    if bad_member is not None:
+                        return result(f"bad CRC for '{bad_member}'")
+    except (OSError, ValueError, BadZipFile, zlib.error) as e:
+        return result(str(e))
+
+    return result()
+
+
+def _get_user_cache_dir() -> Path:
+    if sys.platform == "win32":
+        return Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches"
+
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+
+
+class RepoVerifier:
+    _CACHE_DIR_NAME: Final[str] = "kodi-repo-bootstrap"
+
+    def __init__(self, repo_dir: Path, jobs: Optional[int]=None) -> None:
+        self.__repo_dir: Path = repo_dir
+        self.__jobs: Optional[int] = jobs
+
+        # the cache must not be stored in the repo_dir, because that directory gets published
+        # (there is one cache file per repository, named by the hash of its path)
+        repo_dir_hash: str = hashlib.md5(str(repo_dir.resolve()).encode(DEFAULT_FILE_ENCODING)).hexdigest()
+        self.__cache_file: Path = _get_user_cache_dir() / RepoVerifier._CACHE_DIR_NAME / "verify" / \
+            f"{repo_dir_hash}.json"
+
+    def verify(self) -> bool:
+        print(f"Verifying repository: '{self.__repo_dir}'")
+
+        cache: Dict[str, Dict[str, int]] = self.__read_cache()
+        new_cache: Dict[str, Dict[str, int]] = {}
+
+        # only the files that are new or have changed since the last verification need to be checked
+        files_to_check: List[Path] = []
+        cached_count: int = 0
+
+        file_path: Path
+        for file_path in Directory.multi_glob(self.__repo_dir,
+                                              # repo_dir/
+                                              #    |- addons.xml
+                                              #    |- plugin.addon.id/
+                                              #    |    |- plugin.addon.id-versionX.zip
+                                              "addons.xml", "*/*.zip"):
+            rel_path: str = file_path.relative_to(self.__repo_dir).as_posix()
+            if rel_path in cache and cache[rel_path] == self.__get_cache_entry(file_path):
+                new_cache[rel_path] = cache[rel_path]
+                cached_count += 1
+            else:
+                files_to_check.append(file_path)
+
+        failed_count: int = 0
+        verify_result: VerifyResult
+        for verify_result in self.__verify_files(files_to_check):
+            if verify_result.ok:
+                new_cache[verify_result.file_path.relative_to(self.__repo_dir).as_posix()] = \
+                    verify_result.cache_entry()
+            else:
+                failed_count += 1
+                print(f"Verification failed for '{verify_result.file_path}':\n\t{verify_result.error}")
+
+        self.__write_cache(new_cache)
+
+        print(f"Verified {len(files_to_check) + cached_count} files "
+              f"({cached_count} unchanged since the last verification), {failed_count} failed.")
+
+        return failed_count == 0
+
+    def __verify_files(self, files_to_check: List[Path]) -> List[VerifyResult]:
+        if not files_to_check:
+            return []
+
+        # multiprocessing is only imported if there is something to verify
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor: ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=self.__jobs) as executor:
+            # hand out the files in chunks to reduce the IPC overhead for many small archives
+            chunksize: int = max(1, len(files_to_check) // ((self.__jobs or os.cpu_count() or 1) * 4))
+
+            return list(executor.map(_verify_file, files_to_check, chunksize=chunksize))
+
+    def __get_cache_entry(self, file_path: Path) -> Dict[str, int]:
+        stat: os.stat_result = file_path.stat()
+        md5_file_path: Path = File.get_md5_file_path(file_path)
+
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "md5_mtime_ns": md5_file_path.stat().st_mtime_ns if md5_file_path.is_file() else -1
+        }
+
+    def __read_cache(self) -> Dict[str, Dict[str, int]]:
+        if not self.__cache_file.is_file():
+            return {}
+
+        loaded_cache: Any
+        with open(self.__cache_file, 'r', encoding=DEFAULT_FILE_ENCODING) as f:
+            try:
+                loaded_cache = json.load(f)
+            except json.JSONDecodeError:
+                print("Warning: Error parsing the verification cache. Verifying all files.")
+                loaded_cache = {}
+
+        if not isinstance(loaded_cache, dict):
+            return {}
+
+        return loaded_cache
+
+    def __write_cache(self, cache: Dict[str, Dict[str, int]]) -> None:
+        try:
+            self.__cache_file.parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: Cannot create the verification cache directory '{self.__cache_file.parent}'.\n{e}")
+            return
+
+        File.save_file(json.dumps(cache, sort_keys=True, indent=4), file_path=self.__cache_file)